@@ -22,15 +22,44 @@ License: MIT
 """
 
 import argparse
+import fnmatch
+import functools
 import json
 import os
 import platform
 import re
+import shlex
+import stat
+import struct
 import subprocess
 import sys
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, FrozenSet, Iterable, List, Optional, Any, Set, Tuple
+
+# Optional faster JSON parser/serializer for large PowerShell outputs and reports
+try:
+    import orjson
+    from orjson import loads as json_loads
+
+    def json_dumps(obj: Any, ensure_ascii: bool = True) -> str:
+        """Serialize obj as indented JSON (non-str keys become strings).
+        
+        orjson has no ASCII mode, so ASCII-escaped output (safe to print on
+        any console encoding) comes from the stdlib; raw UTF-8 uses orjson.
+        """
+        if ensure_ascii:
+            return json.dumps(obj, indent=2)
+        return orjson.dumps(
+            obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        ).decode("utf-8")
+except ImportError:
+    json_loads = json.loads
+
+    def json_dumps(obj: Any, ensure_ascii: bool = True) -> str:
+        """Serialize obj as indented JSON, optionally keeping non-ASCII text."""
+        return json.dumps(obj, indent=2, ensure_ascii=ensure_ascii)
 
 
 # =============================================================================
@@ -40,6 +69,9 @@ from typing import Dict, List, Optional, Any, Tuple
 VERSION = "1.0.0"
 TOOL_NAME = "SecurityExceptionAuditor"
 
+# Operating system name, looked up once (it can't change while running)
+SYSTEM = platform.system()
+
 # Default Team Brain whitelist
 TEAM_BRAIN_WHITELIST = {
     "python": {
@@ -114,6 +146,41 @@ TEAM_BRAIN_WHITELIST = {
     }
 }
 
+# Drive-letter paths embedded in Bitdefender config files (matched on raw bytes)
+BITDEFENDER_PATH_PATTERN = re.compile(rb'[A-Za-z]:\\[^"\'<>\|\?\*\n\r]+')
+
+# Config files are scanned in chunks of this size to bound memory use
+BITDEFENDER_READ_CHUNK = 64 * 1024
+
+# Longest path-like run carried across chunks (Windows extended path limit)
+BITDEFENDER_MAX_PATH_BYTES = 32 * 1024
+
+# File name patterns searched for exclusion data in Bitdefender config dirs
+BITDEFENDER_CONFIG_PATTERNS = ["*.xml", "*.json", "*.ini", "settings*", "exclusions*"]
+
+# PowerShell launcher shared by every Windows query (-NoProfile skips loading
+# the user's profile scripts, a large part of PowerShell cold-start time)
+POWERSHELL_CMD = ["powershell", "-NoProfile", "-NonInteractive", "-Command"]
+
+# Firewall rule names treated as built-in system rules (case-insensitive,
+# valid as both a Python and a .NET regex)
+SYSTEM_FIREWALL_RULE_REGEX = "core networking|windows|microsoft|netlogon"
+SYSTEM_FIREWALL_RULE_PATTERN = re.compile(SYSTEM_FIREWALL_RULE_REGEX, re.IGNORECASE)
+
+# Queries combined into a single PowerShell invocation by PowerShellBatch
+POWERSHELL_BATCH_QUERIES = {
+    "Defender": "Get-MpPreference",
+    "Firewall": (
+        "@(Get-NetFirewallRule | Where-Object {$_.Enabled -eq 'True' -and "
+        f"$_.DisplayName -notmatch '{SYSTEM_FIREWALL_RULE_REGEX}'}} | "
+        "Select-Object DisplayName, Direction, Action, Profile)"
+    ),
+    "Processes": (
+        "@(Get-Process | Where-Object {$_.Path -ne $null} | "
+        "Select-Object Name, Path, Id)"
+    ),
+}
+
 
 # =============================================================================
 # DATA CLASSES
@@ -122,6 +189,12 @@ TEAM_BRAIN_WHITELIST = {
 class SecurityException:
     """Represents a security exception/exclusion entry."""
     
+    # Audits create one instance per rule/path; slots keep them small
+    __slots__ = (
+        "path", "exception_type", "product", "created",
+        "exists", "ports", "direction", "raw_data",
+    )
+    
     def __init__(
         self,
         path: str,
@@ -163,6 +236,11 @@ class SecurityException:
 class AuditResult:
     """Results from a security audit."""
     
+    __slots__ = (
+        "product", "exceptions", "errors", "warnings",
+        "audit_time", "requires_elevation",
+    )
+    
     def __init__(self, product: str):
         self.product = product
         self.exceptions: List[SecurityException] = []
@@ -184,12 +262,14 @@ class AuditResult:
         return sum(1 for e in self.exceptions if e.exists)
     
     def to_dict(self) -> Dict:
+        total = self.total_count
+        stale = self.stale_count
         return {
             "product": self.product,
             "audit_time": self.audit_time.isoformat(),
-            "total_exceptions": self.total_count,
-            "active_exceptions": self.active_count,
-            "stale_exceptions": self.stale_count,
+            "total_exceptions": total,
+            "active_exceptions": total - stale,
+            "stale_exceptions": stale,
             "requires_elevation": self.requires_elevation,
             "exceptions": [e.to_dict() for e in self.exceptions],
             "errors": self.errors,
@@ -197,6 +277,214 @@ class AuditResult:
         }
 
 
+# =============================================================================
+# FILESYSTEM
+# =============================================================================
+
+class StatCache:
+    """Memoizes filesystem checks for the duration of one audit run.
+
+    Exclusion paths and whitelist entries repeat across products, so each
+    normalized path is stat'd at most once and exists/isfile/isdir are all
+    derived from that single result. Safe to share between auditor threads.
+    """
+
+    def __init__(self):
+        self._stats: Dict[str, Optional[os.stat_result]] = {}
+        self._access: Dict[str, bool] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(path: str) -> str:
+        return os.path.normcase(os.path.normpath(path))
+
+    def stat(self, path: str) -> Optional[os.stat_result]:
+        """Return the stat result for path, or None if it doesn't exist."""
+        if not path:
+            return None
+
+        key = self._key(path)
+        with self._lock:
+            if key in self._stats:
+                return self._stats[key]
+
+        try:
+            st = os.stat(key)
+        except (OSError, ValueError):
+            st = None
+
+        with self._lock:
+            return self._stats.setdefault(key, st)
+
+    def exists(self, path: str) -> bool:
+        return self.stat(path) is not None
+
+    def exists_only(self, path: str) -> bool:
+        """Check existence alone using access(2), cheaper than a full stat."""
+        if not path:
+            return False
+
+        key = self._key(path)
+        with self._lock:
+            if key in self._stats:
+                return self._stats[key] is not None
+            if key in self._access:
+                return self._access[key]
+
+        try:
+            found = os.access(key, os.F_OK)
+        except (OSError, ValueError):
+            # e.g. an embedded NUL byte: treat as missing, like stat()
+            found = False
+
+        with self._lock:
+            return self._access.setdefault(key, found)
+
+    def isfile(self, path: str) -> bool:
+        st = self.stat(path)
+        return st is not None and stat.S_ISREG(st.st_mode)
+
+    def isdir(self, path: str) -> bool:
+        st = self.stat(path)
+        return st is not None and stat.S_ISDIR(st.st_mode)
+
+
+class PathTrie:
+    """Prefix tree of lower-cased path components.
+
+    Answers "is this path, one of its ancestors, or something inside it
+    already excluded?" in time proportional to the path depth instead of
+    the number of exclusions.
+    """
+
+    # Components are never empty, so "" is free to mark an inserted path
+    END = ""
+
+    def __init__(self, paths: Optional[Iterable[str]] = None):
+        self._root: Dict[str, Dict] = {}
+        # Normalized added paths, so exact matches skip the walk
+        self._exact: Set[str] = set()
+        for path in paths or []:
+            self.add(path)
+
+    @staticmethod
+    def split(path: str) -> List[str]:
+        """Split a Windows or POSIX path into lower-cased components."""
+        return [part for part in path.lower().replace("/", "\\").split("\\") if part]
+
+    def add(self, path: str):
+        parts = self.split(path)
+        # A "folder\*" wildcard excludes everything under folder
+        if parts and parts[-1] == "*":
+            parts.pop()
+        if not parts:
+            return
+
+        self._exact.add("\\".join(parts))
+        node = self._root
+        for part in parts:
+            node = node.setdefault(part, {})
+        node[self.END] = {}
+
+    def covers(self, path: str) -> bool:
+        """True if path, an ancestor of path, or a descendant was added."""
+        parts = self.split(path)
+        if not parts:
+            return False
+        if "\\".join(parts) in self._exact:
+            return True
+
+        node = self._root
+        for part in parts:
+            node = node.get(part)
+            if node is None:
+                return False
+            if self.END in node:
+                return True
+
+        # Walked the whole path: it is a parent of something added
+        return True
+
+
+# =============================================================================
+# POWERSHELL
+# =============================================================================
+
+def powershell_literal(value: str) -> str:
+    """Quote a value as a PowerShell literal string (no variable expansion)."""
+    return "'" + value.replace("'", "''") + "'"
+
+
+def run_powershell(script: str, timeout: int = 30) -> subprocess.CompletedProcess:
+    """Run a PowerShell script without loading the user profile."""
+    return subprocess.run(
+        POWERSHELL_CMD + [script],
+        capture_output=True,
+        text=True,
+        timeout=timeout
+    )
+
+
+class PowerShellBatch:
+    """Runs several PowerShell queries in one invocation, on first use.
+
+    Each PowerShell start costs ~300-800ms, so the Defender, firewall and
+    process queries of one audit run share a single batch. Every query runs
+    in its own try/catch, so one failure (e.g. Defender requiring elevation)
+    is reported for that query only. Safe to share between auditor threads;
+    concurrent callers wait for the one PowerShell run.
+    """
+
+    def __init__(self, queries: Optional[List[str]] = None, timeout: int = 60):
+        self.queries = list(queries) if queries is not None else list(POWERSHELL_BATCH_QUERIES)
+        self.timeout = timeout
+        self._data: Optional[Dict[str, Any]] = None
+        self._failure: Optional[Exception] = None
+        self._stderr = ""
+        self._lock = threading.Lock()
+
+    def build_script(self) -> str:
+        """Build the combined PowerShell script for the selected queries."""
+        lines = ["$ErrorActionPreference = 'Stop'", "$r = @{}"]
+        for name in self.queries:
+            lines.append(
+                f"try {{ $r.{name} = {POWERSHELL_BATCH_QUERIES[name]} }} "
+                f"catch {{ $r.{name}Error = $_.Exception.Message }}"
+            )
+        lines.append("$r | ConvertTo-Json -Depth 5 -Compress")
+        return "\n".join(lines)
+
+    def _load(self):
+        with self._lock:
+            if self._data is not None or self._failure is not None:
+                return
+
+            try:
+                output = run_powershell(self.build_script(), timeout=self.timeout)
+                self._stderr = output.stderr or ""
+                if output.returncode != 0 or not output.stdout.strip():
+                    self._data = {}
+                else:
+                    data = json_loads(output.stdout)
+                    self._data = data if isinstance(data, dict) else {}
+            except Exception as e:
+                self._failure = e
+
+    def get(self, name: str) -> Tuple[Any, str]:
+        """Return (data, error message) for one query.
+
+        Raises the original exception if the PowerShell call itself failed
+        (timeout, unparseable output).
+        """
+        self._load()
+        if self._failure is not None:
+            raise self._failure
+
+        if name in self._data:
+            return self._data[name], ""
+        return None, self._data.get(f"{name}Error") or self._stderr
+
+
 # =============================================================================
 # WINDOWS DEFENDER AUDITOR
 # =============================================================================
@@ -204,14 +492,20 @@ class AuditResult:
 class WindowsDefenderAuditor:
     """Audits Windows Defender exclusions."""
     
+    powershell_query = "Defender"
+    
     def __init__(self):
         self.product = "defender"
     
     def is_available(self) -> bool:
         """Check if Windows Defender is available."""
-        return platform.system() == "Windows"
+        return SYSTEM == "Windows"
     
-    def audit(self) -> AuditResult:
+    def audit(
+        self,
+        batch: Optional[PowerShellBatch] = None,
+        cache: Optional[StatCache] = None
+    ) -> AuditResult:
         """Audit Windows Defender exclusions."""
         result = AuditResult(self.product)
         
@@ -219,25 +513,25 @@ class WindowsDefenderAuditor:
             result.errors.append("Windows Defender not available on this platform")
             return result
         
+        if batch is None:
+            batch = PowerShellBatch([self.powershell_query])
+        if cache is None:
+            cache = StatCache()
+        
         try:
             # Use PowerShell to get exclusions
-            ps_cmd = "Get-MpPreference | ConvertTo-Json -Depth 5"
-            output = subprocess.run(
-                ["powershell", "-Command", ps_cmd],
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
+            prefs, error = batch.get(self.powershell_query)
             
-            if output.returncode != 0:
-                if "requires elevation" in output.stderr.lower() or "access is denied" in output.stderr.lower():
+            if error:
+                error_lower = error.lower()
+                if "requires elevation" in error_lower or "access is denied" in error_lower:
                     result.requires_elevation = True
                     result.warnings.append("Admin privileges required for full audit")
                 else:
-                    result.errors.append(f"PowerShell error: {output.stderr}")
+                    result.errors.append(f"PowerShell error: {error}")
                 return result
             
-            prefs = json.loads(output.stdout)
+            prefs = prefs or {}
             
             # Process path exclusions
             path_exclusions = prefs.get("ExclusionPath", []) or []
@@ -245,10 +539,17 @@ class WindowsDefenderAuditor:
                 path_exclusions = [path_exclusions]
             
             for path in path_exclusions:
-                exists = os.path.exists(path)
+                # A trailing separator or wildcard marks a folder without a
+                # stat; otherwise one cached stat answers both questions
+                if path.endswith(("\\", "/", "*")):
+                    exception_type = "folder"
+                    exists = cache.exists_only(path)
+                else:
+                    exception_type = "path" if cache.isfile(path) else "folder"
+                    exists = cache.exists(path)
                 exc = SecurityException(
                     path=path,
-                    exception_type="path" if os.path.isfile(path) else "folder",
+                    exception_type=exception_type,
                     product=self.product,
                     exists=exists
                 )
@@ -260,7 +561,10 @@ class WindowsDefenderAuditor:
                 process_exclusions = [process_exclusions]
             
             for proc in process_exclusions:
-                exists = os.path.exists(proc) if os.path.isabs(proc) else True
+                # Only full paths (C:\... or UNC) can go stale; bare
+                # process names always apply
+                is_full_path = proc[1:3] in (":\\", ":/") or proc.startswith("\\\\")
+                exists = cache.exists_only(proc) if is_full_path else True
                 exc = SecurityException(
                     path=proc,
                     exception_type="process",
@@ -294,41 +598,41 @@ class WindowsDefenderAuditor:
     
     def add_exclusion(self, path: str, dry_run: bool = True) -> Tuple[bool, str]:
         """Add a path exclusion to Windows Defender."""
-        if dry_run:
-            return True, f"[DRY-RUN] Would add exclusion: {path}"
-        
-        try:
-            ps_cmd = f'Add-MpPreference -ExclusionPath "{path}"'
-            output = subprocess.run(
-                ["powershell", "-Command", ps_cmd],
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            
-            if output.returncode == 0:
-                return True, f"Added exclusion: {path}"
-            else:
-                return False, f"Failed: {output.stderr}"
-        except Exception as e:
-            return False, f"Error: {e}"
+        return self.add_exclusions([path], dry_run=dry_run)
     
     def remove_exclusion(self, path: str, dry_run: bool = True) -> Tuple[bool, str]:
         """Remove a path exclusion from Windows Defender."""
+        return self.remove_exclusions([path], dry_run=dry_run)
+    
+    def add_exclusions(self, paths: List[str], dry_run: bool = True) -> Tuple[bool, str]:
+        """Add path exclusions to Windows Defender in one PowerShell call."""
+        return self.update_exclusions("Add", paths, dry_run)
+    
+    def remove_exclusions(self, paths: List[str], dry_run: bool = True) -> Tuple[bool, str]:
+        """Remove path exclusions from Windows Defender in one PowerShell call."""
+        return self.update_exclusions("Remove", paths, dry_run)
+    
+    def update_exclusions(self, action: str, paths: List[str], dry_run: bool = True) -> Tuple[bool, str]:
+        """Run Add-/Remove-MpPreference once for a list of paths."""
+        verb, done = {"Add": ("add", "Added"), "Remove": ("remove", "Removed")}[action]
+        if not paths:
+            return True, f"No exclusions to {verb}"
+        
+        label = "exclusion" if len(paths) == 1 else "exclusions"
+        listed = ", ".join(paths)
+        
         if dry_run:
-            return True, f"[DRY-RUN] Would remove exclusion: {path}"
+            return True, f"[DRY-RUN] Would {verb} {label}: {listed}"
         
         try:
-            ps_cmd = f'Remove-MpPreference -ExclusionPath "{path}"'
-            output = subprocess.run(
-                ["powershell", "-Command", ps_cmd],
-                capture_output=True,
-                text=True,
-                timeout=30
+            ps_cmd = (
+                f"$p = @({', '.join(powershell_literal(p) for p in paths)}); "
+                f"{action}-MpPreference -ExclusionPath $p"
             )
+            output = run_powershell(ps_cmd, timeout=30)
             
             if output.returncode == 0:
-                return True, f"Removed exclusion: {path}"
+                return True, f"{done} {label}: {listed}"
             else:
                 return False, f"Failed: {output.stderr}"
         except Exception as e:
@@ -344,33 +648,36 @@ class BitdefenderAuditor:
     
     def __init__(self):
         self.product = "bitdefender"
+        self._available: Optional[bool] = None
         self.config_locations = [
             Path(os.environ.get("ProgramData", "C:\\ProgramData")) / "Bitdefender",
             Path.home() / "AppData" / "Roaming" / "Bitdefender",
         ]
     
     def is_available(self) -> bool:
-        """Check if Bitdefender appears to be installed."""
-        if platform.system() != "Windows":
+        """Check if Bitdefender appears to be installed (probed once)."""
+        if self._available is None:
+            self._available = self.detect_installation()
+        return self._available
+    
+    def detect_installation(self) -> bool:
+        """Probe the filesystem for a Bitdefender installation."""
+        if SYSTEM != "Windows":
             return False
         
-        # Check for Bitdefender program files
-        program_paths = [
-            Path("C:\\Program Files\\Bitdefender"),
-            Path("C:\\Program Files (x86)\\Bitdefender"),
-        ]
-        
-        for path in program_paths:
-            if path.exists():
-                return True
-        
-        for loc in self.config_locations:
-            if loc.exists():
-                return True
+        # Bitdefender program files, then its config directories
+        candidates = [
+            "C:\\Program Files\\Bitdefender",
+            "C:\\Program Files (x86)\\Bitdefender",
+        ] + [str(loc) for loc in self.config_locations]
         
-        return False
+        return any(os.access(path, os.F_OK) for path in candidates)
     
-    def audit(self) -> AuditResult:
+    def audit(
+        self,
+        batch: Optional[PowerShellBatch] = None,
+        cache: Optional[StatCache] = None
+    ) -> AuditResult:
         """Audit Bitdefender exclusions (best effort)."""
         result = AuditResult(self.product)
         
@@ -378,52 +685,45 @@ class BitdefenderAuditor:
             result.errors.append("Bitdefender not detected on this system")
             return result
         
+        if cache is None:
+            cache = StatCache()
+        
         result.warnings.append(
             "Bitdefender has limited API access. "
             "Results may be incomplete. Check Bitdefender GUI for full exclusion list."
         )
         
         # Try to find and parse config files
-        exclusions_found = []
+        exclusions_found: Set[str] = set()
         
         for config_dir in self.config_locations:
-            if not config_dir.exists():
+            if not cache.exists_only(str(config_dir)):
                 continue
             
             # Look for common config file patterns
-            for pattern in ["*.xml", "*.json", "*.ini", "settings*", "exclusions*"]:
+            for config_file in self.iter_config_files(config_dir, result):
                 try:
-                    for config_file in config_dir.rglob(pattern):
-                        try:
-                            content = config_file.read_text(encoding='utf-8', errors='ignore')
-                            
-                            # Look for path-like patterns in config
-                            path_patterns = re.findall(
-                                r'[A-Za-z]:\\[^"\'<>\|\?\*\n\r]+',
-                                content
-                            )
-                            
-                            for path in path_patterns:
-                                # Filter out system paths and Bitdefender's own paths
-                                if "Bitdefender" in path:
-                                    continue
-                                if path not in exclusions_found:
-                                    exclusions_found.append(path)
-                                    exists = os.path.exists(path)
-                                    exc = SecurityException(
-                                        path=path,
-                                        exception_type="path",
-                                        product=self.product,
-                                        exists=exists,
-                                        raw_data={"source_file": str(config_file)}
-                                    )
-                                    result.exceptions.append(exc)
-                        except PermissionError:
-                            result.requires_elevation = True
-                        except Exception:
-                            pass
+                    # Look for path-like patterns in config
+                    for path in self.iter_config_paths(config_file):
+                        # Filter out system paths and Bitdefender's own paths
+                        if "Bitdefender" in path:
+                            continue
+                        if path in exclusions_found:
+                            continue
+                        exclusions_found.add(path)
+                        exists = cache.exists_only(path)
+                        exc = SecurityException(
+                            path=path,
+                            exception_type="path",
+                            product=self.product,
+                            exists=exists,
+                            raw_data={"source_file": config_file}
+                        )
+                        result.exceptions.append(exc)
                 except PermissionError:
                     result.requires_elevation = True
+                except Exception:
+                    pass
         
         if not result.exceptions:
             result.warnings.append(
@@ -433,6 +733,69 @@ class BitdefenderAuditor:
         
         return result
     
+    def iter_config_files(self, root: Path, result: AuditResult):
+        """Yield config files under root matching any config pattern.
+        
+        Walks the tree once with os.scandir, so file type checks come from
+        the directory listing instead of a stat per entry.
+        """
+        stack = [str(root)]
+        while stack:
+            directory = stack.pop()
+            try:
+                entries = os.scandir(directory)
+            except PermissionError:
+                result.requires_elevation = True
+                continue
+            except OSError:
+                continue
+            
+            with entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file() and any(
+                            fnmatch.fnmatch(entry.name, pattern)
+                            for pattern in BITDEFENDER_CONFIG_PATTERNS
+                        ):
+                            yield entry.path
+                    except OSError:
+                        continue
+    
+    def iter_config_paths(self, config_file: str):
+        """Yield drive-letter paths found in a config file.
+        
+        The file is read in binary chunks and only matched slices are
+        decoded. A match touching the end of a chunk is carried over, so
+        paths straddling a chunk boundary are found whole.
+        """
+        carry = b""
+        with open(config_file, "rb") as f:
+            while True:
+                chunk = f.read(BITDEFENDER_READ_CHUNK)
+                buffer = carry + chunk
+                # Keep a possible bare drive prefix (e.g. C:\) for the next chunk
+                carry = buffer[-3:]
+                
+                if b":\\" not in buffer:
+                    if not chunk:
+                        break
+                    continue
+                
+                for match in BITDEFENDER_PATH_PATTERN.finditer(buffer):
+                    if chunk and match.end() == len(buffer):
+                        # May continue in the next chunk; drop runs too long
+                        # to be a real path
+                        carry = buffer[match.start():]
+                        if len(carry) > BITDEFENDER_MAX_PATH_BYTES:
+                            carry = b""
+                        break
+                    yield match.group().decode("utf-8", "ignore")
+                
+                if not chunk:
+                    break
+    
     def get_bduitool_path(self) -> Optional[Path]:
         """Find Bitdefender command line tool if available."""
         search_paths = [
@@ -455,14 +818,20 @@ class BitdefenderAuditor:
 class WindowsFirewallAuditor:
     """Audits Windows Firewall rules."""
     
+    powershell_query = "Firewall"
+    
     def __init__(self):
         self.product = "windows_firewall"
     
     def is_available(self) -> bool:
         """Check if Windows Firewall is available."""
-        return platform.system() == "Windows"
+        return SYSTEM == "Windows"
     
-    def audit(self) -> AuditResult:
+    def audit(
+        self,
+        batch: Optional[PowerShellBatch] = None,
+        cache: Optional[StatCache] = None
+    ) -> AuditResult:
         """Audit Windows Firewall rules."""
         result = AuditResult(self.product)
         
@@ -470,34 +839,25 @@ class WindowsFirewallAuditor:
             result.errors.append("Windows Firewall not available on this platform")
             return result
         
+        if batch is None:
+            batch = PowerShellBatch([self.powershell_query])
+        
         try:
             # Get all firewall rules
-            ps_cmd = (
-                "Get-NetFirewallRule | Where-Object {$_.Enabled -eq 'True'} | "
-                "Select-Object DisplayName, Direction, Action, Profile | "
-                "ConvertTo-Json -Depth 3"
-            )
-            
-            output = subprocess.run(
-                ["powershell", "-Command", ps_cmd],
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
+            rules, error = batch.get(self.powershell_query)
             
-            if output.returncode != 0:
-                if "requires elevation" in output.stderr.lower():
+            if error:
+                if "requires elevation" in error.lower():
                     result.requires_elevation = True
                     result.warnings.append("Admin privileges may be needed for full details")
                 else:
-                    result.errors.append(f"PowerShell error: {output.stderr}")
+                    result.errors.append(f"PowerShell error: {error}")
                 return result
             
-            if not output.stdout.strip():
+            if not rules:
                 result.warnings.append("No firewall rules found or access denied")
                 return result
             
-            rules = json.loads(output.stdout)
             if isinstance(rules, dict):
                 rules = [rules]
             
@@ -506,10 +866,8 @@ class WindowsFirewallAuditor:
                 display_name = rule.get("DisplayName", "Unknown")
                 direction = rule.get("Direction", 0)
                 
-                # Skip system rules (basic heuristic)
-                if any(skip in display_name.lower() for skip in [
-                    "core networking", "windows", "microsoft", "netlogon"
-                ]):
+                # Skip system rules (basic heuristic, also applied in PowerShell)
+                if SYSTEM_FIREWALL_RULE_PATTERN.search(display_name):
                     continue
                 
                 exc = SecurityException(
@@ -541,12 +899,55 @@ class LinuxFirewallAuditor:
     
     def __init__(self):
         self.product = "linux_firewall"
+        self.ufw_config = Path("/etc/ufw/ufw.conf")
+        self.ufw_rules_files = [
+            Path("/etc/ufw/user.rules"),
+            Path("/etc/ufw/user6.rules"),
+        ]
     
     def is_available(self) -> bool:
         """Check if running on Linux."""
-        return platform.system() == "Linux"
+        return SYSTEM == "Linux"
     
-    def audit(self) -> AuditResult:
+    def read_ufw_rules(self) -> Optional[List[str]]:
+        """Read ufw user rules straight from its rule files.
+        
+        Returns the rule descriptions from the '### tuple ###' lines, an
+        empty list if ufw is disabled, or None if the files can't be read
+        (not installed, or no permission) so the caller can fall back to
+        the ufw binary.
+        """
+        try:
+            config = self.ufw_config.read_text(encoding='utf-8', errors='ignore')
+            if not re.search(r'^\s*ENABLED\s*=\s*yes\b', config, re.MULTILINE | re.IGNORECASE):
+                return []
+            
+            rules = []
+            for rules_file in self.ufw_rules_files:
+                if not rules_file.exists():
+                    continue
+                for line in rules_file.read_text(encoding='utf-8', errors='ignore').splitlines():
+                    if line.startswith("### tuple ###"):
+                        rules.append(line[len("### tuple ###"):].strip())
+            return rules
+        except OSError:
+            return None
+    
+    @staticmethod
+    def ufw_rule_direction(rule: str) -> str:
+        """Get the direction of a ufw rule tuple ('in', 'out', 'in_eth0'...)."""
+        for token in rule.split()[1:]:
+            if token == "in" or token.startswith("in_"):
+                return "inbound"
+            if token == "out" or token.startswith("out_"):
+                return "outbound"
+        return "both"
+    
+    def audit(
+        self,
+        batch: Optional[PowerShellBatch] = None,
+        cache: Optional[StatCache] = None
+    ) -> AuditResult:
         """Audit Linux firewall rules."""
         result = AuditResult(self.product)
         
@@ -554,62 +955,129 @@ class LinuxFirewallAuditor:
             result.errors.append("Linux firewall not available on this platform")
             return result
         
-        # Try ufw first
-        try:
-            output = subprocess.run(
-                ["ufw", "status", "verbose"],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
+        # Try ufw first, reading its rule files directly when possible
+        ufw_rules = self.read_ufw_rules()
+        if ufw_rules is not None:
+            for rule in ufw_rules:
+                exc = SecurityException(
+                    path=rule,
+                    exception_type="firewall",
+                    product="ufw",
+                    exists=True,
+                    direction=self.ufw_rule_direction(rule),
+                    raw_data={"rule": rule}
+                )
+                result.exceptions.append(exc)
+        else:
+            try:
+                output = subprocess.run(
+                    ["ufw", "status", "verbose"],
+                    capture_output=True,
+                    text=True,
+                    timeout=10
+                )
+                
+                if output.returncode == 0:
+                    for line in output.stdout.splitlines():
+                        if 'ALLOW' in line or 'DENY' in line:
+                            exc = SecurityException(
+                                path=line.strip(),
+                                exception_type="firewall",
+                                product="ufw",
+                                exists=True,
+                                raw_data={"rule": line}
+                            )
+                            result.exceptions.append(exc)
+            except FileNotFoundError:
+                # ufw not installed, try iptables
+                pass
+            except PermissionError:
+                result.requires_elevation = True
+                result.warnings.append("Root privileges required for ufw")
+        
+        # Prefer iptables-save's canonical one-rule-per-line output, falling
+        # back to iptables -L if it isn't installed
+        if not self.audit_iptables_save(result):
+            try:
+                output = subprocess.run(
+                    ["iptables", "-L", "-n", "--line-numbers"],
+                    capture_output=True,
+                    text=True,
+                    timeout=10
+                )
+                
+                if output.returncode == 0:
+                    for line in output.stdout.splitlines():
+                        if line.strip() and not line.startswith("Chain") and not line.startswith("num"):
+                            exc = SecurityException(
+                                path=line.strip(),
+                                exception_type="firewall",
+                                product="iptables",
+                                exists=True,
+                                raw_data={"rule": line}
+                            )
+                            result.exceptions.append(exc)
+            except FileNotFoundError:
+                result.warnings.append("iptables not found")
+            except PermissionError:
+                result.requires_elevation = True
+                result.warnings.append("Root privileges required for iptables")
+        
+        return result
+    
+    def audit_iptables_save(self, result: AuditResult) -> bool:
+        """Add filter-table rules from iptables-save and ip6tables-save.
+        
+        Returns False if iptables-save isn't installed.
+        """
+        for command, product in [("iptables-save", "iptables"), ("ip6tables-save", "ip6tables")]:
+            try:
+                output = subprocess.run(
+                    [command, "-t", "filter"],
+                    capture_output=True,
+                    text=True,
+                    timeout=10
+                )
+                
+                if output.returncode == 0:
+                    result.exceptions.extend(self.parse_iptables_save(output.stdout, product))
+            except FileNotFoundError:
+                if product == "iptables":
+                    return False
+            except PermissionError:
+                result.requires_elevation = True
+                result.warnings.append(f"Root privileges required for {command}")
+        
+        return True
+    
+    @staticmethod
+    def parse_iptables_save(output: str, product: str = "iptables") -> List[SecurityException]:
+        """Parse the '-A CHAIN ...' rule lines of iptables-save output."""
+        exceptions = []
+        for line in output.splitlines():
+            if not line.startswith("-A "):
+                continue
             
-            if output.returncode == 0:
-                lines = output.stdout.split('\n')
-                for line in lines:
-                    if 'ALLOW' in line or 'DENY' in line:
-                        exc = SecurityException(
-                            path=line.strip(),
-                            exception_type="firewall",
-                            product="ufw",
-                            exists=True,
-                            raw_data={"rule": line}
-                        )
-                        result.exceptions.append(exc)
-        except FileNotFoundError:
-            # ufw not installed, try iptables
-            pass
-        except PermissionError:
-            result.requires_elevation = True
-            result.warnings.append("Root privileges required for ufw")
-        
-        # Try iptables
-        try:
-            output = subprocess.run(
-                ["iptables", "-L", "-n", "--line-numbers"],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
+            try:
+                args = shlex.split(line)
+            except ValueError:
+                args = line.split()
+            if len(args) < 2:
+                continue
             
-            if output.returncode == 0:
-                lines = output.stdout.split('\n')
-                for line in lines:
-                    if line.strip() and not line.startswith("Chain") and not line.startswith("num"):
-                        exc = SecurityException(
-                            path=line.strip(),
-                            exception_type="firewall",
-                            product="iptables",
-                            exists=True,
-                            raw_data={"rule": line}
-                        )
-                        result.exceptions.append(exc)
-        except FileNotFoundError:
-            result.warnings.append("iptables not found")
-        except PermissionError:
-            result.requires_elevation = True
-            result.warnings.append("Root privileges required for iptables")
+            chain = args[1]
+            direction = {"INPUT": "inbound", "OUTPUT": "outbound"}.get(chain, "both")
+            exc = SecurityException(
+                path=f"{chain}: {' '.join(args[2:])}",
+                exception_type="firewall",
+                product=product,
+                exists=True,
+                direction=direction,
+                raw_data={"rule": line, "chain": chain, "args": args[2:]}
+            )
+            exceptions.append(exc)
         
-        return result
+        return exceptions
 
 
 # =============================================================================
@@ -617,28 +1085,39 @@ class LinuxFirewallAuditor:
 # =============================================================================
 
 class ProcessChecker:
-    """Check if processes/ports are currently running."""
+    """Check if processes/ports are currently running.
+    
+    Process and port listings are cached, so repeated checks reuse one
+    subprocess call. The cache lives until clear_cache() is called;
+    SecurityExceptionAuditor.check_process_and_port clears it so every
+    check sees a fresh listing.
+    """
+    
+    @staticmethod
+    def clear_cache():
+        """Forget cached process and port listings."""
+        ProcessChecker.get_running_processes.cache_clear()
+        ProcessChecker.get_listening_ports.cache_clear()
+        ProcessChecker.get_listening_port_set.cache_clear()
+        ProcessChecker.get_process_index.cache_clear()
     
     @staticmethod
+    @functools.lru_cache(maxsize=1)  # no arguments: the cache holds one listing
     def get_running_processes() -> List[Dict]:
         """Get list of running processes with paths."""
         processes = []
         
-        if platform.system() == "Windows":
+        if SYSTEM == "Windows":
             try:
-                ps_cmd = (
-                    "Get-Process | Where-Object {$_.Path -ne $null} | "
-                    "Select-Object Name, Path, Id | ConvertTo-Json"
-                )
-                output = subprocess.run(
-                    ["powershell", "-Command", ps_cmd],
-                    capture_output=True,
-                    text=True,
-                    timeout=30
-                )
+                return ProcessChecker.get_windows_processes()
+            except Exception:
+                # Fall back to PowerShell if the Win32 API is unavailable
+                pass
+            
+            try:
+                procs, error = PowerShellBatch(["Processes"], timeout=30).get("Processes")
                 
-                if output.returncode == 0 and output.stdout.strip():
-                    procs = json.loads(output.stdout)
+                if not error and procs:
                     if isinstance(procs, dict):
                         procs = [procs]
                     processes = procs
@@ -655,7 +1134,7 @@ class ProcessChecker:
                 )
                 
                 if output.returncode == 0:
-                    for line in output.stdout.split('\n')[1:]:
+                    for line in output.stdout.splitlines()[1:]:
                         parts = line.split(None, 10)
                         if len(parts) >= 11:
                             processes.append({
@@ -669,11 +1148,157 @@ class ProcessChecker:
         return processes
     
     @staticmethod
+    def get_windows_processes() -> List[Dict]:
+        """Enumerate Windows processes in-process via the Toolhelp32 API.
+        
+        Avoids starting PowerShell. Like `Get-Process | Where Path`, only
+        processes whose image path can be queried are returned.
+        """
+        import ctypes
+        from ctypes import wintypes
+        
+        TH32CS_SNAPPROCESS = 0x00000002
+        PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+        INVALID_HANDLE_VALUE = ctypes.c_void_p(-1).value
+        
+        class PROCESSENTRY32W(ctypes.Structure):
+            _fields_ = [
+                ("dwSize", wintypes.DWORD),
+                ("cntUsage", wintypes.DWORD),
+                ("th32ProcessID", wintypes.DWORD),
+                ("th32DefaultHeapID", ctypes.c_void_p),
+                ("th32ModuleID", wintypes.DWORD),
+                ("cntThreads", wintypes.DWORD),
+                ("th32ParentProcessID", wintypes.DWORD),
+                ("pcPriClassBase", wintypes.LONG),
+                ("dwFlags", wintypes.DWORD),
+                ("szExeFile", wintypes.WCHAR * 260),
+            ]
+        
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        kernel32.CreateToolhelp32Snapshot.restype = wintypes.HANDLE
+        kernel32.CreateToolhelp32Snapshot.argtypes = [wintypes.DWORD, wintypes.DWORD]
+        kernel32.Process32FirstW.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESSENTRY32W)]
+        kernel32.Process32NextW.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESSENTRY32W)]
+        kernel32.OpenProcess.restype = wintypes.HANDLE
+        kernel32.OpenProcess.argtypes = [wintypes.DWORD, wintypes.BOOL, wintypes.DWORD]
+        kernel32.QueryFullProcessImageNameW.argtypes = [
+            wintypes.HANDLE, wintypes.DWORD, wintypes.LPWSTR, ctypes.POINTER(wintypes.DWORD)
+        ]
+        kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+        
+        snapshot = kernel32.CreateToolhelp32Snapshot(TH32CS_SNAPPROCESS, 0)
+        if snapshot == INVALID_HANDLE_VALUE:
+            raise ctypes.WinError(ctypes.get_last_error())
+        
+        processes = []
+        try:
+            entry = PROCESSENTRY32W()
+            entry.dwSize = ctypes.sizeof(PROCESSENTRY32W)
+            path_buffer = ctypes.create_unicode_buffer(32768)
+            
+            more = kernel32.Process32FirstW(snapshot, ctypes.byref(entry))
+            while more:
+                pid = entry.th32ProcessID
+                handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+                if handle:
+                    try:
+                        size = wintypes.DWORD(len(path_buffer))
+                        if kernel32.QueryFullProcessImageNameW(
+                            handle, 0, path_buffer, ctypes.byref(size)
+                        ):
+                            processes.append({
+                                "Name": os.path.splitext(entry.szExeFile)[0],
+                                "Path": path_buffer.value,
+                                "Id": pid
+                            })
+                    finally:
+                        kernel32.CloseHandle(handle)
+                more = kernel32.Process32NextW(snapshot, ctypes.byref(entry))
+        finally:
+            kernel32.CloseHandle(snapshot)
+        
+        return processes
+    
+    @staticmethod
+    def parse_ip_table(
+        table: bytes,
+        row_size: int,
+        port_offset: int,
+        pid_offset: int,
+        state: str
+    ) -> List[Dict]:
+        """Parse a MIB_*TABLE_OWNER_PID buffer from the IP Helper API.
+        
+        The table is a DWORD row count followed by fixed-size rows. Ports
+        are stored in network byte order, PIDs as little-endian DWORDs.
+        """
+        (count,) = struct.unpack_from("<I", table, 0)
+        ports = []
+        for i in range(count):
+            row = 4 + i * row_size
+            (port,) = struct.unpack_from(">H", table, row + port_offset)
+            (pid,) = struct.unpack_from("<I", table, row + pid_offset)
+            ports.append({"port": port, "state": state, "pid": pid})
+        return ports
+    
+    @staticmethod
+    def get_windows_listening_ports() -> List[Dict]:
+        """Get listening TCP and bound UDP ports via the IP Helper API.
+        
+        One in-process call per table, already filtered to listeners, so
+        no netstat start and no service-name lookups.
+        """
+        import ctypes
+        from ctypes import wintypes
+        
+        AF_INET = 2
+        AF_INET6 = 23
+        TCP_TABLE_OWNER_PID_LISTENER = 3
+        UDP_TABLE_OWNER_PID = 1
+        ERROR_INSUFFICIENT_BUFFER = 122
+        
+        iphlpapi = ctypes.WinDLL("iphlpapi")
+        
+        # (function, family, table class, row size, port offset, pid offset, state)
+        tables = [
+            (iphlpapi.GetExtendedTcpTable, AF_INET, TCP_TABLE_OWNER_PID_LISTENER, 24, 8, 20, "LISTENING"),
+            (iphlpapi.GetExtendedTcpTable, AF_INET6, TCP_TABLE_OWNER_PID_LISTENER, 56, 20, 52, "LISTENING"),
+            (iphlpapi.GetExtendedUdpTable, AF_INET, UDP_TABLE_OWNER_PID, 12, 4, 8, "BOUND"),
+            (iphlpapi.GetExtendedUdpTable, AF_INET6, UDP_TABLE_OWNER_PID, 28, 20, 24, "BOUND"),
+        ]
+        
+        ports = []
+        for func, family, table_class, row_size, port_offset, pid_offset, state in tables:
+            size = wintypes.DWORD(0)
+            buffer = ctypes.create_string_buffer(4)
+            while True:
+                ret = func(buffer, ctypes.byref(size), False, family, table_class, 0)
+                if ret == 0:
+                    break
+                if ret != ERROR_INSUFFICIENT_BUFFER:
+                    raise ctypes.WinError(ret)
+                buffer = ctypes.create_string_buffer(size.value)
+            
+            ports.extend(ProcessChecker.parse_ip_table(
+                buffer.raw, row_size, port_offset, pid_offset, state
+            ))
+        
+        return ports
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
     def get_listening_ports() -> List[Dict]:
         """Get list of ports currently listening."""
         ports = []
         
-        if platform.system() == "Windows":
+        if SYSTEM == "Windows":
+            try:
+                return ProcessChecker.get_windows_listening_ports()
+            except Exception:
+                # Fall back to netstat if the IP Helper API is unavailable
+                pass
+            
             try:
                 output = subprocess.run(
                     ["netstat", "-an"],
@@ -683,20 +1308,19 @@ class ProcessChecker:
                 )
                 
                 if output.returncode == 0:
-                    for line in output.stdout.split('\n'):
-                        if 'LISTENING' in line or 'ESTABLISHED' in line:
-                            parts = line.split()
-                            if len(parts) >= 2:
-                                local = parts[1]
-                                if ':' in local:
-                                    port = local.split(':')[-1]
-                                    try:
-                                        ports.append({
-                                            "port": int(port),
-                                            "state": parts[-1] if len(parts) > 3 else "UNKNOWN"
-                                        })
-                                    except ValueError:
-                                        pass
+                    for line in output.stdout.splitlines():
+                        if 'LISTENING' not in line and 'ESTABLISHED' not in line:
+                            continue
+                        parts = line.split()
+                        if len(parts) < 2 or ':' not in parts[1]:
+                            continue
+                        try:
+                            ports.append({
+                                "port": int(parts[1].rpartition(':')[2]),
+                                "state": parts[-1] if len(parts) > 3 else "UNKNOWN"
+                            })
+                        except ValueError:
+                            pass
             except Exception:
                 pass
         else:
@@ -709,45 +1333,59 @@ class ProcessChecker:
                 )
                 
                 if output.returncode == 0:
-                    for line in output.stdout.split('\n')[1:]:
-                        if line.strip():
-                            parts = line.split()
-                            if len(parts) >= 5:
-                                local = parts[4]
-                                if ':' in local:
-                                    port = local.split(':')[-1]
-                                    try:
-                                        ports.append({
-                                            "port": int(port),
-                                            "state": parts[1]
-                                        })
-                                    except ValueError:
-                                        pass
+                    for line in output.stdout.splitlines()[1:]:
+                        parts = line.split()
+                        if len(parts) < 5 or ':' not in parts[4]:
+                            continue
+                        try:
+                            ports.append({
+                                "port": int(parts[4].rpartition(':')[2]),
+                                "state": parts[1]
+                            })
+                        except ValueError:
+                            pass
             except FileNotFoundError:
                 pass
         
         return ports
     
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def get_process_index() -> Tuple[FrozenSet[str], str]:
+        """Get lower-cased process names and a searchable name/path string.
+        
+        The string joins every name and path with NUL separators, so one
+        substring search covers all processes.
+        """
+        names = set()
+        fields = []
+        for proc in ProcessChecker.get_running_processes():
+            proc_name = (proc.get("Name") or "").lower()
+            names.add(proc_name)
+            fields.append(proc_name)
+            fields.append((proc.get("Path") or "").lower())
+        return frozenset(names), "\x00".join(fields)
+    
     @staticmethod
     def check_process(name: str) -> bool:
         """Check if a process with given name is running."""
-        processes = ProcessChecker.get_running_processes()
-        name_lower = name.lower()
-        
-        for proc in processes:
-            proc_name = proc.get("Name", "").lower()
-            proc_path = proc.get("Path", "").lower()
-            
-            if name_lower in proc_name or name_lower in proc_path:
-                return True
+        names, haystack = ProcessChecker.get_process_index()
+        if not names:
+            return False
         
-        return False
+        name_lower = name.lower()
+        return name_lower in names or name_lower in haystack
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def get_listening_port_set() -> FrozenSet[int]:
+        """Get the set of port numbers currently listening."""
+        return frozenset(p["port"] for p in ProcessChecker.get_listening_ports())
     
     @staticmethod
     def check_port(port: int) -> bool:
         """Check if a port is in use."""
-        ports = ProcessChecker.get_listening_ports()
-        return any(p["port"] == port for p in ports)
+        return port in ProcessChecker.get_listening_port_set()
 
 
 # =============================================================================
@@ -766,24 +1404,63 @@ class SecurityExceptionAuditor:
         }
         self.process_checker = ProcessChecker()
         self.team_brain_whitelist = TEAM_BRAIN_WHITELIST
+        self._available_products: Optional[List[str]] = None
     
     def get_available_products(self) -> List[str]:
-        """Get list of available security products on this system."""
-        available = []
-        for name, auditor in self.auditors.items():
-            if auditor.is_available():
-                available.append(name)
-        return available
-    
-    def audit(self, products: Optional[List[str]] = None) -> Dict[str, AuditResult]:
-        """Audit security exceptions for specified products."""
+        """Get list of available security products on this system.
+        
+        Installed products don't change while the tool runs, so the probe
+        is done once per instance.
+        """
+        if self._available_products is None:
+            self._available_products = [
+                name for name, auditor in self.auditors.items()
+                if auditor.is_available()
+            ]
+        return list(self._available_products)
+    
+    def audit(
+        self,
+        products: Optional[List[str]] = None,
+        cache: Optional[StatCache] = None,
+        parallel: bool = True
+    ) -> Dict[str, AuditResult]:
+        """Audit security exceptions for specified products.
+        
+        Auditors spend nearly all their time waiting on subprocesses, so by
+        default they run concurrently in threads.
+        """
         if products is None:
             products = self.get_available_products()
+        if cache is None:
+            cache = StatCache()
+        
+        # Windows queries for all requested products share one PowerShell call
+        batch = PowerShellBatch([
+            self.auditors[p].powershell_query for p in products
+            if getattr(self.auditors.get(p), "powershell_query", None)
+        ])
+        
+        known = [p for p in products if p in self.auditors]
+        audited = {}
+        if parallel and len(known) > 1:
+            # Imported here: it pulls in logging, which most commands never need
+            from concurrent.futures import ThreadPoolExecutor
+            
+            with ThreadPoolExecutor(max_workers=len(known)) as executor:
+                futures = {
+                    p: executor.submit(self.audit_product, p, batch, cache)
+                    for p in known
+                }
+                audited = {p: future.result() for p, future in futures.items()}
+        else:
+            for product in known:
+                audited[product] = self.audit_product(product, batch, cache)
         
         results = {}
         for product in products:
-            if product in self.auditors:
-                results[product] = self.auditors[product].audit()
+            if product in audited:
+                results[product] = audited[product]
             else:
                 result = AuditResult(product)
                 result.errors.append(f"Unknown product: {product}")
@@ -791,41 +1468,61 @@ class SecurityExceptionAuditor:
         
         return results
     
-    def generate_recommendations(self) -> Dict[str, Any]:
-        """Generate recommended exceptions for Team Brain tools."""
+    def audit_product(
+        self,
+        product: str,
+        batch: PowerShellBatch,
+        cache: StatCache
+    ) -> AuditResult:
+        """Run one auditor, reporting a crash as an error instead of raising."""
+        try:
+            return self.auditors[product].audit(batch=batch, cache=cache)
+        except Exception as e:
+            result = AuditResult(product)
+            result.errors.append(f"Audit failed: {e}")
+            return result
+    
+    def generate_recommendations(
+        self,
+        audit_results: Optional[Dict[str, AuditResult]] = None,
+        cache: Optional[StatCache] = None,
+        generated_at: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """Generate recommended exceptions for Team Brain tools.
+        
+        Pass the results and StatCache of an earlier audit() to reuse them
+        instead of auditing and stat'ing every path again.
+        """
         recommendations = {
-            "generated_at": datetime.now().isoformat(),
-            "platform": platform.system(),
+            "generated_at": (generated_at or datetime.now()).isoformat(),
+            "platform": SYSTEM,
             "recommendations": [],
             "missing": [],
             "already_covered": [],
         }
         
         # Get current audit
-        audit_results = self.audit()
+        if cache is None:
+            cache = StatCache()
+        if audit_results is None:
+            audit_results = self.audit(cache=cache)
         
-        # Collect all current exception paths
-        current_paths = set()
-        for result in audit_results.values():
-            for exc in result.exceptions:
-                current_paths.add(exc.path.lower())
-                # Also add parent directories
-                path = Path(exc.path)
-                for parent in path.parents:
-                    current_paths.add(str(parent).lower())
+        # Collect all current exception paths (products often share entries)
+        current_paths = PathTrie({
+            exc.path
+            for result in audit_results.values()
+            for exc in result.exceptions
+        })
         
         # Check each Team Brain whitelist item
         for key, item in self.team_brain_whitelist.items():
             for path in item.get("paths", []):
-                path_lower = path.lower()
-                exists = os.path.exists(path.rstrip('\\'))
+                # Folder entries end in a separator; check the bare path
+                target = path.rstrip('\\')
+                exists = cache.exists_only(target)
                 
                 # Check if already covered
-                is_covered = False
-                for current in current_paths:
-                    if path_lower.startswith(current) or current.startswith(path_lower):
-                        is_covered = True
-                        break
+                is_covered = current_paths.covers(target)
                 
                 rec = {
                     "name": item["name"],
@@ -848,10 +1545,15 @@ class SecurityExceptionAuditor:
         
         return recommendations
     
-    def find_stale_exceptions(self) -> List[SecurityException]:
+    def find_stale_exceptions(
+        self,
+        audit_results: Optional[Dict[str, AuditResult]] = None,
+        cache: Optional[StatCache] = None
+    ) -> List[SecurityException]:
         """Find exceptions for paths that no longer exist."""
         stale = []
-        audit_results = self.audit()
+        if audit_results is None:
+            audit_results = self.audit(cache=cache)
         
         for result in audit_results.values():
             for exc in result.exceptions:
@@ -866,16 +1568,32 @@ class SecurityExceptionAuditor:
             "timestamp": datetime.now().isoformat(),
         }
         
+        # Listings are cached per process; each check takes a new snapshot
+        ProcessChecker.clear_cache()
+        
+        if process and port:
+            # Independent probes (process list vs. socket table): overlap them
+            from concurrent.futures import ThreadPoolExecutor
+            
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                process_future = executor.submit(ProcessChecker.check_process, process)
+                port_future = executor.submit(ProcessChecker.check_port, port)
+                is_running = process_future.result()
+                is_in_use = port_future.result()
+        else:
+            is_running = ProcessChecker.check_process(process) if process else None
+            is_in_use = ProcessChecker.check_port(port) if port else None
+        
         if process:
             result["process"] = {
                 "name": process,
-                "is_running": ProcessChecker.check_process(process)
+                "is_running": is_running
             }
         
         if port:
             result["port"] = {
                 "number": port,
-                "is_in_use": ProcessChecker.check_port(port)
+                "is_in_use": is_in_use
             }
         
         return result
@@ -885,13 +1603,31 @@ class SecurityExceptionAuditor:
 # REPORT GENERATORS
 # =============================================================================
 
-def generate_markdown_report(audit_results: Dict[str, AuditResult], recommendations: Dict = None) -> str:
-    """Generate a markdown audit report."""
+def summarize_results(audit_results: Dict[str, AuditResult]) -> Tuple[int, int, int]:
+    """Return (total, active, stale) exception counts across all products."""
+    total = stale = 0
+    for result in audit_results.values():
+        total += result.total_count
+        stale += result.stale_count
+    return total, total - stale, stale
+
+
+def generate_markdown_report(
+    audit_results: Dict[str, AuditResult],
+    recommendations: Dict = None,
+    summary: Optional[Tuple[int, int, int]] = None,
+    generated_at: Optional[datetime] = None
+) -> str:
+    """Generate a markdown audit report.
+    
+    summary is an optional precomputed summarize_results() tuple and
+    generated_at the timestamp shared with the recommendations.
+    """
     lines = [
         "# Security Exception Audit Report",
         "",
-        f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-        f"**Platform:** {platform.system()} {platform.release()}",
+        f"**Generated:** {(generated_at or datetime.now()).strftime('%Y-%m-%d %H:%M:%S')}",
+        f"**Platform:** {SYSTEM} {platform.release()}",
         f"**Tool:** SecurityExceptionAuditor v{VERSION}",
         "",
         "---",
@@ -899,9 +1635,7 @@ def generate_markdown_report(audit_results: Dict[str, AuditResult], recommendati
     ]
     
     # Summary
-    total_exceptions = sum(r.total_count for r in audit_results.values())
-    total_stale = sum(r.stale_count for r in audit_results.values())
-    total_active = sum(r.active_count for r in audit_results.values())
+    total_exceptions, total_active, total_stale = summary or summarize_results(audit_results)
     
     lines.extend([
         "## Summary",
@@ -924,14 +1658,12 @@ def generate_markdown_report(audit_results: Dict[str, AuditResult], recommendati
         
         if result.errors:
             lines.append("### Errors")
-            for err in result.errors:
-                lines.append(f"- [X] {err}")
+            lines.extend(f"- [X] {err}" for err in result.errors)
             lines.append("")
         
         if result.warnings:
             lines.append("### Warnings")
-            for warn in result.warnings:
-                lines.append(f"- [!] {warn}")
+            lines.extend(f"- [!] {warn}" for warn in result.warnings)
             lines.append("")
         
         if result.requires_elevation:
@@ -945,11 +1677,10 @@ def generate_markdown_report(audit_results: Dict[str, AuditResult], recommendati
                 "| Status | Type | Path |",
                 "|--------|------|------|",
             ])
-            
-            for exc in result.exceptions:
-                status = "[OK]" if exc.exists else "[STALE]"
-                lines.append(f"| {status} | {exc.exception_type} | `{exc.path}` |")
-            
+            lines.extend(
+                f"| {'[OK]' if exc.exists else '[STALE]'} | {exc.exception_type} | `{exc.path}` |"
+                for exc in result.exceptions
+            )
             lines.append("")
         else:
             lines.append("*No exceptions found*")
@@ -971,10 +1702,10 @@ def generate_markdown_report(audit_results: Dict[str, AuditResult], recommendati
                 "| Name | Path | Reason |",
                 "|------|------|--------|",
             ])
-            
-            for rec in recommendations["missing"]:
-                lines.append(f"| {rec['name']} | `{rec['path']}` | {rec['reason']} |")
-            
+            lines.extend(
+                f"| {rec['name']} | `{rec['path']}` | {rec['reason']} |"
+                for rec in recommendations["missing"]
+            )
             lines.append("")
         
         if recommendations.get("already_covered"):
@@ -982,10 +1713,10 @@ def generate_markdown_report(audit_results: Dict[str, AuditResult], recommendati
                 "### Already Covered",
                 "",
             ])
-            
-            for rec in recommendations["already_covered"]:
-                lines.append(f"- [OK] {rec['name']}: `{rec['path']}`")
-            
+            lines.extend(
+                f"- [OK] {rec['name']}: `{rec['path']}`"
+                for rec in recommendations["already_covered"]
+            )
             lines.append("")
     
     # Cleanup recommendations
@@ -999,13 +1730,12 @@ def generate_markdown_report(audit_results: Dict[str, AuditResult], recommendati
             "The following exceptions point to paths that no longer exist:",
             "",
         ])
-        
-        for exc in stale_list:
-            lines.append(f"- `{exc.path}` ({exc.product})")
-        
-        lines.append("")
-        lines.append("Run `securityaudit cleanup --dry-run` to preview removal.")
-        lines.append("")
+        lines.extend(f"- `{exc.path}` ({exc.product})" for exc in stale_list)
+        lines.extend([
+            "",
+            "Run `securityaudit cleanup --dry-run` to preview removal.",
+            "",
+        ])
     
     lines.extend([
         "---",
@@ -1016,19 +1746,31 @@ def generate_markdown_report(audit_results: Dict[str, AuditResult], recommendati
     return "\n".join(lines)
 
 
-def generate_json_report(audit_results: Dict[str, AuditResult], recommendations: Dict = None) -> str:
-    """Generate a JSON audit report."""
+def generate_json_report(
+    audit_results: Dict[str, AuditResult],
+    recommendations: Dict = None,
+    summary: Optional[Tuple[int, int, int]] = None,
+    generated_at: Optional[datetime] = None,
+    ensure_ascii: bool = True
+) -> str:
+    """Generate a JSON audit report.
+    
+    summary is an optional precomputed summarize_results() tuple and
+    generated_at the timestamp shared with the recommendations. Pass
+    ensure_ascii=False only for UTF-8 file output, never for the console.
+    """
+    total_exceptions, total_active, total_stale = summary or summarize_results(audit_results)
     report = {
         "metadata": {
-            "generated_at": datetime.now().isoformat(),
-            "platform": platform.system(),
+            "generated_at": (generated_at or datetime.now()).isoformat(),
+            "platform": SYSTEM,
             "platform_release": platform.release(),
             "tool_version": VERSION,
         },
         "summary": {
-            "total_exceptions": sum(r.total_count for r in audit_results.values()),
-            "active_exceptions": sum(r.active_count for r in audit_results.values()),
-            "stale_exceptions": sum(r.stale_count for r in audit_results.values()),
+            "total_exceptions": total_exceptions,
+            "active_exceptions": total_active,
+            "stale_exceptions": total_stale,
             "products_audited": list(audit_results.keys()),
         },
         "products": {k: v.to_dict() for k, v in audit_results.items()},
@@ -1037,7 +1779,7 @@ def generate_json_report(audit_results: Dict[str, AuditResult], recommendations:
     if recommendations:
         report["recommendations"] = recommendations
     
-    return json.dumps(report, indent=2)
+    return json_dumps(report, ensure_ascii)
 
 
 # =============================================================================
@@ -1061,30 +1803,37 @@ def cmd_audit(args):
     print(f"[*] Auditing: {', '.join(products)}")
     print()
     
-    # Run audit
-    results = auditor.audit(products)
+    # Run audit (recommendations reuse its filesystem checks and timestamp)
+    generated_at = datetime.now()
+    cache = StatCache()
+    results = auditor.audit(products, cache=cache)
     
     # Generate recommendations if requested
     recommendations = None
     if args.recommend:
-        recommendations = auditor.generate_recommendations()
+        recommendations = auditor.generate_recommendations(results, cache, generated_at)
     
     # Generate report
+    summary = summarize_results(results)
     if args.format == "json":
-        report = generate_json_report(results, recommendations)
+        # Printed JSON stays ASCII-escaped so any console encoding can show it
+        report = generate_json_report(
+            results, recommendations, summary, generated_at,
+            ensure_ascii=not args.output
+        )
     else:
-        report = generate_markdown_report(results, recommendations)
+        report = generate_markdown_report(results, recommendations, summary, generated_at)
     
     # Output
     if args.output:
         output_path = Path(args.output)
-        output_path.write_text(report, encoding='utf-8')
+        output_path.write_bytes(report.encode('utf-8'))
         print(f"[OK] Report saved to: {output_path}")
     else:
         print(report)
     
     # Summary
-    total_stale = sum(r.stale_count for r in results.values())
+    total_stale = summary[2]
     if total_stale > 0:
         print()
         print(f"[!] Found {total_stale} stale exception(s) - run 'securityaudit cleanup' to review")
@@ -1102,7 +1851,7 @@ def cmd_recommend(args):
     recommendations = auditor.generate_recommendations()
     
     if args.format == "json":
-        output = json.dumps(recommendations, indent=2)
+        output = json_dumps(recommendations, ensure_ascii=not args.output)
     else:
         # Markdown format
         lines = [
@@ -1147,7 +1896,7 @@ def cmd_recommend(args):
     
     if args.output:
         output_path = Path(args.output)
-        output_path.write_text(output, encoding='utf-8')
+        output_path.write_bytes(output.encode('utf-8'))
         print(f"[OK] Recommendations saved to: {output_path}")
     else:
         print(output)
@@ -1217,14 +1966,19 @@ def cmd_cleanup(args):
         print("[!] Removing stale exceptions...")
         
         defender_auditor = WindowsDefenderAuditor()
+        defender_paths = []
         
         for exc in stale:
             if exc.product == "defender":
-                success, msg = defender_auditor.remove_exclusion(exc.path, dry_run=False)
-                status = "[OK]" if success else "[X]"
-                print(f"  {status} {msg}")
+                defender_paths.append(exc.path)
             else:
                 print(f"  [SKIP] {exc.product} - manual removal required")
+        
+        # All Defender removals share one PowerShell call
+        if defender_paths:
+            success, msg = defender_auditor.remove_exclusions(defender_paths, dry_run=False)
+            status = "[OK]" if success else "[X]"
+            print(f"  {status} {msg}")
     
     return 0
 
@@ -1256,6 +2010,11 @@ def cmd_products(args):
 
 def main():
     """Main CLI entry point."""
+    # A bare version query needs none of the subcommand parsers below
+    if sys.argv[1:] in (["--version"], ["-v"]):
+        print(f"securityaudit {VERSION}")
+        return 0
+    
     parser = argparse.ArgumentParser(
         prog="securityaudit",
         description="SecurityExceptionAuditor - Manage security software exceptions for development",
@@ -1295,25 +2054,30 @@ For more information: https://github.com/DonkRonk17/SecurityExceptionAuditor
     audit_parser.add_argument("--output", "-o", help="Output file path")
     audit_parser.add_argument("--format", "-f", choices=["markdown", "json"], default="markdown")
     audit_parser.add_argument("--recommend", "-r", action="store_true", help="Include recommendations")
+    audit_parser.set_defaults(func=cmd_audit)
     
     # recommend command
     recommend_parser = subparsers.add_parser("recommend", help="Generate whitelist recommendations")
     recommend_parser.add_argument("--output", "-o", help="Output file path")
     recommend_parser.add_argument("--format", "-f", choices=["markdown", "json"], default="markdown")
+    recommend_parser.set_defaults(func=cmd_recommend)
     
     # check command
     check_parser = subparsers.add_parser("check", help="Check process/port status")
     check_parser.add_argument("--process", help="Process name to check")
     check_parser.add_argument("--port", type=int, help="Port number to check")
     check_parser.add_argument("--format", "-f", choices=["text", "json"], default="text")
+    check_parser.set_defaults(func=cmd_check)
     
     # cleanup command
     cleanup_parser = subparsers.add_parser("cleanup", help="Clean up stale exceptions")
     cleanup_parser.add_argument("--dry-run", action="store_true", help="Preview only, no changes")
     cleanup_parser.add_argument("--apply", action="store_true", help="Actually remove exceptions")
+    cleanup_parser.set_defaults(func=cmd_cleanup)
     
     # products command
-    subparsers.add_parser("products", help="List available security products")
+    products_parser = subparsers.add_parser("products", help="List available security products")
+    products_parser.set_defaults(func=cmd_products)
     
     args = parser.parse_args()
     
@@ -1321,15 +2085,7 @@ For more information: https://github.com/DonkRonk17/SecurityExceptionAuditor
         parser.print_help()
         return 0
     
-    commands = {
-        "audit": cmd_audit,
-        "recommend": cmd_recommend,
-        "check": cmd_check,
-        "cleanup": cmd_cleanup,
-        "products": cmd_products,
-    }
-    
-    return commands[args.command](args)
+    return args.func(args)
 
 
 if __name__ == "__main__":
@@ -32,6 +32,9 @@ setup(
     
     # No external dependencies!
     install_requires=[],
+    extras_require={
+        "fast": ["orjson"],  # Optional faster JSON parsing and reports
+    },
     
     entry_points={
         "console_scripts": [